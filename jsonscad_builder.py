@@ -7,21 +7,228 @@ License:
 """
 
 import json
-from collections import OrderedDict
-from random import choice
-from rdp import rdp
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from itertools import repeat
+from random import choice, choices
+import numpy as np
+
+# ijson is only needed to stream features from large GeoJSON files
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# orjson is only needed to parse GeoJSON files and to serialize NumPy arrays
+# faster than the json module
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# numba is only needed to compile the fast RDP kernel
+try:
+    import numba
+except ImportError:
+    numba = None
+
+# HELPER FUNCTIONS
+def _rdp(coords, eps):
+    """Simplifies a linear ring using the Ramer-Douglas-Peucker Algorithm.
+
+    Uses the compiled `_rdp_mask_numba()` kernel if numba is installed, and 
+    the NumPy `_rdp_mask_numpy()` otherwise. Returns the kept points as an 
+    `(N, 2)` NumPy array.
+
+    Args:
+        coords: An `(N, 2)` NumPy array or a list of `[x, y]` points.
+        eps: The epsilon parameter of the RDP algorithm.
+    """
+    points = np.ascontiguousarray(coords, dtype=np.float64)
+    if len(points) < 3:
+        return points
+    return points[_rdp_mask(points, eps)]
+
+def _rdp_mask(points, eps):
+    """Computes the RDP keep-mask of a contiguous `(N, 2)` NumPy array with 
+    at least 3 points, using the fastest available kernel."""
+    if numba is not None:
+        return _rdp_mask_numba(points, eps)
+    return _rdp_mask_numpy(points, eps)
+
+def _rdp_split(points, coarse_eps):
+    """Splits a linear ring into sub-polylines that can be simplified 
+    independently.
+
+    Splits the ring at the points kept by a coarse RDP pass with 
+    `coarse_eps`. Every split point of the coarse pass is also a split 
+    point of a pass with any smaller epsilon, and RDP never looks past the 
+    ends of a segment once it has been split, so simplifying each 
+    sub-polyline with the smaller epsilon and joining the results gives the 
+    same points as simplifying the whole ring.
+
+    Args:
+        points: A contiguous `(N, 2)` NumPy array with at least 3 points.
+        coarse_eps: The epsilon parameter of the coarse RDP pass.
+    """
+    anchors = np.flatnonzero(_rdp_mask(points, coarse_eps))
+    return [points[lo:hi+1] for lo, hi in zip(anchors[:-1], anchors[1:])]
+
+def _join_pieces(pieces):
+    """Joins simplified sub-polylines from `_rdp_split()` into one ring. 
+    Consecutive pieces share an end point, which is only kept once."""
+    return np.concatenate([pieces[0]] + [piece[1:] for piece in pieces[1:]])
+
+def _rdp_mask_numpy(points, eps):
+    """Computes the RDP keep-mask of a linear ring with NumPy.
+
+    Iterative implementation of RDP. Each segment `[lo, hi]` on the stack 
+    computes the perpendicular distances of all of its interior points at 
+    once and is split at the farthest point if that distance exceeds `eps`.
+    Distances are compared squared, so no square roots are taken. Returns 
+    a boolean array that is True for the points to keep.
+
+    Args:
+        points: An `(N, 2)` NumPy array with at least 3 points.
+        eps: The epsilon parameter of the RDP algorithm.
+    """
+    num_points = len(points)
+    keep = np.ones(num_points, dtype=bool)
+    eps_sq = eps * eps
+    stack = [(0, num_points - 1)]
+    while stack:
+        lo, hi = stack.pop()
+        if hi - lo < 2:
+            continue
+
+        start = points[lo]
+        seg = points[hi] - start
+        rel = start - points[lo+1:hi]
+        seg_len_sq = seg[0]*seg[0] + seg[1]*seg[1]
+        if seg_len_sq == 0:
+            # Closed rings start and end on the same point, so measure the
+            # distance to that point instead of to a line
+            dists_sq = rel[:, 0]*rel[:, 0] + rel[:, 1]*rel[:, 1]
+            thresh = eps_sq
+        else:
+            # Squared cross product is the squared distance to the line 
+            # scaled by the squared segment length
+            cross = seg[0]*rel[:, 1] - seg[1]*rel[:, 0]
+            dists_sq = cross * cross
+            thresh = eps_sq * seg_len_sq
+
+        i = np.argmax(dists_sq)
+        if dists_sq[i] > thresh:
+            split = lo + 1 + i
+            stack.append((split, hi))
+            stack.append((lo, split))
+        else:
+            keep[lo+1:hi] = False
+
+    return keep
+
+def _rdp_mask_python(points, eps):
+    """Computes the RDP keep-mask of a linear ring point by point.
+
+    Same algorithm as `_rdp_mask_numpy()`, including the squared distance 
+    comparisons, written as scalar loops over a preallocated stack of 
+    `[lo, hi]` segments so that numba can compile it to native code. 
+    Returns a boolean array that is True for the points to keep.
+
+    Args:
+        points: A contiguous `(N, 2)` float64 NumPy array with at least 
+            3 points.
+        eps: The epsilon parameter of the RDP algorithm.
+    """
+    num_points = points.shape[0]
+    keep = np.ones(num_points, dtype=np.bool_)
+    eps_sq = eps * eps
+    # At most N - 1 segments are ever waiting on the stack
+    stack = np.empty((num_points, 2), dtype=np.int64)
+    stack[0, 0] = 0
+    stack[0, 1] = num_points - 1
+    top = 1
+    while top > 0:
+        top -= 1
+        lo = stack[top, 0]
+        hi = stack[top, 1]
+        if hi - lo < 2:
+            continue
+
+        x0 = points[lo, 0]
+        y0 = points[lo, 1]
+        dx = points[hi, 0] - x0
+        dy = points[hi, 1] - y0
+        seg_len_sq = dx*dx + dy*dy
+        if seg_len_sq == 0:
+            thresh = eps_sq
+        else:
+            thresh = eps_sq * seg_len_sq
+
+        dmax_sq = -1.0
+        split = lo
+        for k in range(lo + 1, hi):
+            rx = x0 - points[k, 0]
+            ry = y0 - points[k, 1]
+            if seg_len_sq == 0:
+                # Closed rings start and end on the same point
+                d_sq = rx*rx + ry*ry
+            else:
+                cross = dx*ry - dy*rx
+                d_sq = cross * cross
+            if d_sq > dmax_sq:
+                dmax_sq = d_sq
+                split = k
+
+        if dmax_sq > thresh:
+            stack[top, 0] = split
+            stack[top, 1] = hi
+            stack[top + 1, 0] = lo
+            stack[top + 1, 1] = split
+            top += 2
+        else:
+            keep[lo+1:hi] = False
+
+    return keep
+
+if numba is not None:
+    # Compiled kernel releases the GIL, so rings can be simplified by threads
+    # Bounds checking is turned off explicitly so that the NUMBA_BOUNDSCHECK
+    # environment variable cannot slow down the inner loop
+    _rdp_mask_numba = numba.njit(cache=True, nogil=True, 
+        boundscheck=False)(_rdp_mask_python)
+
+def _rdp_rings(rings, eps):
+    """Applies `_rdp()` to each linear ring in the list `rings`."""
+    return [_rdp(coords, eps) for coords in rings]
+
+def _rdp_transform(coords, eps, origin, scale_factor):
+    """Applies `_rdp()` to a linear ring, then translates the kept points by 
+    `-origin` and scales them by `scale_factor`. Only the points kept by the 
+    RDP keep-mask are transformed, in place."""
+    sampled_coords = _rdp(coords, eps)
+    sampled_coords -= origin
+    sampled_coords *= scale_factor
+    return sampled_coords
+
+def _rdp_transform_rings(rings, eps, origin, scale_factor):
+    """Applies `_rdp_transform()` to each linear ring in the list `rings`."""
+    return [_rdp_transform(coords, eps, origin, scale_factor) 
+        for coords in rings]
 
 class JsonScadBuilder:
     """A class to represent a 3D chroropleth model.
     
     Attributes:
-        raw_json_data: OrderedDict storing raw GeoJSON data.
+        raw_json_data: Dictionary storing raw GeoJSON data.
         features: List storing features from a GeoJSON FeatureCollection.
-        num_features: Integer number of features.
+            The exterior linear ring of each polygon is stored as an 
+            `(N, 2)` NumPy array of `[long, lat]` points.
         bound_data_key_name: String containing the name of the statistical 
             variable that the 3D model visualizes. 
-        origin: List of two elements `[lat, long]` that represents the 
-            geographic coordinate corresponding to (0,0,0) in OpenSCAD.
+        origin: NumPy array of two elements `[long, lat]` that represents 
+            the geographic coordinate corresponding to (0,0,0) in OpenSCAD.
         scale_factor: Number that represents the scaling factor in a scaling 
             transformation of the polygon geometries.
         offset_delta: Number that represents the offset distance for 
@@ -36,6 +243,15 @@ class JsonScadBuilder:
     for a feature."""
     DEFAULT_RDP_EPSILON = 0.01
     """Default epsilon value for the Ramer-Douglas-Peucker (RDP) Algorithm."""
+    PROGRESS_INTERVAL = 64
+    """Minimum number of features between progress reports during geometry 
+    simplification. Large sets of features are reported every 1%."""
+    SPLIT_RING_SIZE = 10000
+    """Minimum number of points in a linear ring for the ring to be split 
+    and simplified by several workers at once."""
+    COARSE_EPSILON_FACTOR = 100
+    """Ratio of the epsilon used to split large linear rings to the epsilon 
+    of the RDP algorithm."""
 
     COLOR_BANK = ['Red', 'Green', 'Blue', 'Brown',
                 'Purple', 'Gold', 'Orange']
@@ -44,9 +260,8 @@ class JsonScadBuilder:
     # CONSTRUCTOR
     def __init__(self):
         """Initializes an instance of JsonScadBuilder."""
-        self.raw_json_data = OrderedDict()
+        self.raw_json_data = {}
         self.features = []
-        self.num_features = 0
         self.bound_data_key_name = ''
         self.origin = []
         self.scale_factor = 1
@@ -54,16 +269,193 @@ class JsonScadBuilder:
         self.is_colored = False
 
     # HELPER FUNCTIONS
-    def _transform_helper(self, pair):
-        return [self.scale_factor * (pair[0]-self.origin[0]), 
-        self.scale_factor * (pair[1]-self.origin[1])]
-    
+    def _exterior_rings(self, feature):
+        # Yield `(container, idx)` for each exterior linear ring of a 
+        # feature, so that the ring `container[idx]` can be replaced
+        geometry = feature['geometry']
+        geometry_type = geometry['type']
+        # Handle polygons 
+        if(geometry_type == "Polygon"):
+            # index 0 contains exterior linear ring
+            yield geometry['coordinates'], 0
+
+        # Handle multipolygons, which store coordinate data
+        # one layer deeper than polygons
+        elif(geometry_type == "MultiPolygon"):
+            for polygon in geometry['coordinates']:
+                # index 0 contains exterior linear ring
+                yield polygon, 0
+
+    def _materialize_arrays(self, feature):
+        # Convert the exterior linear rings of a feature to `(N, 2)` NumPy 
+        # arrays, dropping any altitude values
+        for container, idx in self._exterior_rings(feature):
+            ring = np.asarray(container[idx], dtype=np.float64)
+            if(ring.size == 0):
+                ring = np.empty((0, 2))
+            container[idx] = np.ascontiguousarray(ring[:, :2])
+
+    def _simplify_features(self, eps, max_workers, threaded, processes, 
+        origin = None, scale_factor = None):
+        # Apply RDP with `eps` to the exterior linear rings of each feature, 
+        # in parallel if `threaded`, and return the new number of total 
+        # points. If `origin` is given, also translate the kept points by 
+        # `-origin` and scale them by `scale_factor`
+        num_points = 0 
+
+        if(origin is None):
+            rings_func = partial(_rdp_rings, eps = eps)
+        else:
+            rings_func = partial(_rdp_transform_rings, eps = eps, 
+                origin = origin, scale_factor = scale_factor)
+
+        # Gather the polygons of each feature so that every feature
+        # can be simplified independently by a worker
+        feature_slots = [list(self._exterior_rings(feature)) 
+            for feature in self.features]
+
+        # The compiled RDP kernel releases the GIL, so threads avoid the 
+        # cost of copying rings to and from worker processes. Worker 
+        # processes are only used if the caller asks for them, since they 
+        # fail when the calling script is not guarded by a __main__ check 
+        # on platforms that start processes by importing the script
+        if(numba is None and processes):
+            executor_class = ProcessPoolExecutor
+        else:
+            executor_class = ThreadPoolExecutor
+
+        if(threaded):
+            num_workers = max_workers or os.cpu_count() or 1
+            executor = executor_class(max_workers = max_workers)
+        else:
+            executor = None
+
+        num_features = len(self.features)
+        progress_interval = max(self.PROGRESS_INTERVAL, num_features // 100)
+        try:
+            # The NumPy kernel holds the GIL, so pieces of a ring can only 
+            # be simplified at once by compiled kernels or worker processes
+            if(executor is not None and (numba is not None or processes)):
+                num_points += self._simplify_large_rings(feature_slots, eps, 
+                    executor, num_workers, origin, scale_factor)
+
+            feature_rings = [[container[idx] for container, idx in slots] 
+                for slots in feature_slots]
+            if(executor is not None):
+                # Send features to workers in chunks, but keep enough 
+                # chunks for every worker to stay busy
+                chunksize = max(1, len(feature_rings) // (4 * num_workers))
+                results = executor.map(rings_func, feature_rings, 
+                    chunksize = chunksize)
+            else:
+                results = map(rings_func, feature_rings)
+
+            # Scatter simplified rings back into features in order
+            for feature_idx, (slots, sampled_rings) in enumerate(
+                zip(feature_slots, results)):
+                for (container, idx), sampled_coords in zip(
+                    slots, sampled_rings):
+                    container[idx] = sampled_coords
+                    num_points += len(sampled_coords)
+
+                # Progress report, only every few features
+                num_done = feature_idx + 1
+                if(num_done % progress_interval == 0 or 
+                num_done == num_features):
+                    print("           " + str(num_done) + " of " + 
+                    str(num_features) + " complete")
+        finally:
+            if(executor is not None):
+                executor.shutdown()
+
+        return num_points
+
+    def _simplify_large_rings(self, feature_slots, eps, executor, 
+        num_workers, origin, scale_factor):
+        # Simplify each ring in `feature_slots` that has at least 
+        # SPLIT_RING_SIZE points with RDP by splitting it into sub-polylines 
+        # that are simplified by all workers of `executor`. Otherwise one 
+        # huge ring would keep a single worker busy while the others sit 
+        # idle. Simplified rings are transformed if `origin` is given, 
+        # stored back into their features and removed from `feature_slots`, 
+        # so that they are not simplified again. Returns the number of 
+        # points kept in these rings
+        num_points = 0
+        for slots in feature_slots:
+            small_slots = []
+            for container, idx in slots:
+                coords = container[idx]
+                if(len(coords) < self.SPLIT_RING_SIZE):
+                    small_slots.append((container, idx))
+                    continue
+                points = np.ascontiguousarray(coords, dtype=np.float64)
+                pieces = _rdp_split(points, self.COARSE_EPSILON_FACTOR * eps)
+                chunksize = max(1, len(pieces) // (4 * num_workers))
+                sampled_coords = _join_pieces(list(executor.map(
+                    partial(_rdp, eps = eps), pieces, chunksize = chunksize)))
+                if(origin is not None):
+                    sampled_coords -= origin
+                    sampled_coords *= scale_factor
+                container[idx] = sampled_coords
+                num_points += len(sampled_coords)
+            slots[:] = small_slots
+        return num_points
+
+    def _scad_code(self, features, color_lines, precision):
+        # Yield the OpenSCAD code for each polygon of `features` as bytes. 
+        # The generated code is ASCII, so produce bytes to skip decoding and 
+        # re-encoding the large lists of points. `color_lines` yields the 
+        # color line of each polygon
+        key = self.bound_data_key_name
+
+        # The offset distance and the default extrusion height are the same 
+        # for every polygon, so compose their lines of code once
+        default_extrude_line = (
+            f'linear_extrude(height={self.DEFAULT_EXTRUDE_HEIGHT})\n')
+        if(self.offset_delta != 0):
+            offset_line = f'offset({self.offset_delta})\n'
+        else:
+            offset_line = ''
+
+        # Serialize point arrays directly to bytes if orjson is installed
+        if(orjson is not None):
+            def dump_points(ring):
+                return orjson.dumps(np.ascontiguousarray(ring), 
+                    option = orjson.OPT_SERIALIZE_NUMPY)
+        else:
+            def dump_points(ring):
+                return json.dumps(ring.tolist(), 
+                    separators = (',', ':')).encode()
+
+        if(precision is not None):
+            dump_exact_points = dump_points
+            def dump_points(ring):
+                return dump_exact_points(np.round(ring, precision))
+
+        # Counter so that each list of points has a unique name
+        # points_0, points_1, ..., points_n where there are n-1 total polygons
+        count = 0
+        for feature in features:
+            # Compose the extrusion line once for all polygons of a feature
+            properties = feature['properties']
+            if(key and key in properties):
+                extrude_line = f'linear_extrude(height={properties[key]})\n'
+            else:
+                extrude_line = default_extrude_line
+
+            for container, idx in self._exterior_rings(feature):
+                yield f'points_{count}= '.encode()
+                yield dump_points(container[idx])
+                yield (f';\n{next(color_lines)}{extrude_line}{offset_line}'
+                    f'polygon(points_{count});\n').encode()
+                count += 1
+
     # API METHODS
     def read_json(self, str):
         """Reads GeoJSON data from a string.
 
         Reads and parses data from a string containing a GeoJSON
-        FeatureCollection. Stores the parsed data in OrderedDict
+        FeatureCollection. Stores the parsed data in dictionary
         `raw_json_data`.
 
         Args:
@@ -77,66 +469,85 @@ class JsonScadBuilder:
 
         Reads and parses data from any `.read()`-supporting text file or 
         binary file containing a GeoJSON FeatureCollection. Stores the parsed 
-        data in OrderedDict `raw_json_data`. Conventional file extensions are 
+        data in dictionary `raw_json_data`. Conventional file extensions are 
         .geojson and .json. 
 
         Args:
             filepath: String containing the path to the GeoJSON file.
         """
-        with open(filepath) as f:
-            self.raw_json_data = json.load(f, object_pairs_hook=OrderedDict)
+        if(orjson is not None):
+            with open(filepath, 'rb') as f:
+                self.raw_json_data = orjson.loads(f.read())
+        else:
+            with open(filepath) as f:
+                self.raw_json_data = json.load(f)
         print(status_msg['end_read'] + str(self.raw_json_data.keys()))
 
     def extract_features(self):
         """Extracts the 'features' array from raw_json_data.
 
-        Looks up the 'features' array from the OrderedDict `raw_json_data` 
-        and sets the instance attribute `features` to the array.
+        Looks up the 'features' array from the dictionary `raw_json_data` 
+        and sets the instance attribute `features` to the array. Converts 
+        the exterior linear ring of each polygon into an `(N, 2)` NumPy 
+        array so that later steps can operate on contiguous memory.
         """
         assert self.raw_json_data, error_msg['emp_json']
         self.features = self.raw_json_data['features']
-        self.num_features = len(self.features)
-        print(status_msg['end_extc'] + str(self.num_features))
 
-    def simplify(self, eps = DEFAULT_RDP_EPSILON):
+        for feature in self.features:
+            self._materialize_arrays(feature)
+        print(status_msg['end_extc'] + str(len(self.features)))
+
+    def stream_features(self, filepath):
+        """Streams the 'features' array from a GeoJSON file.
+
+        Alternative to calling `read_json_file()` and `extract_features()` 
+        for large GeoJSON files. Parses the 'features' array of the 
+        FeatureCollection in the file one feature at a time, so that the 
+        whole file is never held in memory as Python objects. Converts the 
+        exterior linear ring of each polygon into an `(N, 2)` NumPy array as 
+        each feature is parsed. Does not set `raw_json_data`. Requires the 
+        `ijson` module.
+
+        Args:
+            filepath: String containing the path to the GeoJSON file.
+        """
+        assert ijson is not None, error_msg['ijson_nf']
+        self.features = []
+        with open(filepath, 'rb') as f:
+            for feature in ijson.items(f, 'features.item', use_float=True):
+                self._materialize_arrays(feature)
+                self.features.append(feature)
+        print(status_msg['end_extc'] + str(len(self.features)))
+
+    def simplify(self, eps = DEFAULT_RDP_EPSILON, max_workers = None, 
+        threaded = True, processes = False):
         """Simplifies the geometries for each feature.
 
         Applies Ramer-Douglas-Peucker (RDP) Algorithm to all polygons 
-        contained in the instance attribute `features`.  
+        contained in the instance attribute `features`. Features are 
+        simplified in parallel by a pool of worker threads, unless 
+        `threaded` is False. Threads are fastest if numba is installed; 
+        otherwise, `processes` can be set to use worker processes instead.
 
         Args:
             eps: The epsilon parameter of the RDP algorithm.
+            max_workers: The maximum number of workers. Defaults to the 
+                executor's default pool size.
+            threaded: Boolean that indicates whether to simplify features 
+                in parallel. If False, features are simplified one at a 
+                time in the calling thread.
+            processes: Boolean that indicates whether to use worker 
+                processes instead of threads if numba is not installed. 
+                On platforms that start worker processes by importing the 
+                calling script (such as Windows and macOS), the script 
+                must be guarded by `if __name__ == '__main__':`.
         """
         assert self.features, error_msg['emp_feat']
         print(status_msg['start_smpl'])
 
-        # Counter for the new number of total points
-        # Print once rdp is done running for all features
-        num_points = 0 
-
-        for idx, feature in enumerate(self.features):
-            # Handle polygons 
-            if(feature['geometry']['type'] == "Polygon"):
-                # index 0 contains exterior linear ring
-                coords = feature['geometry']['coordinates'][0]
-                sampled_coords = rdp(coords, epsilon = eps)
-                feature['geometry']['coordinates'][0] = sampled_coords
-                num_points += len(sampled_coords)
-
-            # Handle multipolygons, which store coordinate data
-            # one layer deeper than polygons
-            elif(feature['geometry']['type'] == "MultiPolygon"):
-                for polygon in feature['geometry']['coordinates']:
-                    # index 0 contains exterior linear ring
-                    coords = polygon[0]
-                    sampled_coords = rdp(coords, epsilon = eps)
-                    polygon[0] = sampled_coords
-                    num_points += len(sampled_coords)
-
-            # Progress report
-            print("           " + 
-            str(idx+1) + " of " + str(self.num_features) + " complete")
-
+        num_points = self._simplify_features(eps, max_workers, threaded, 
+            processes)
         print(status_msg['end_smpl'] + str(num_points))
 
     def transform(self, origin, scale_factor):
@@ -153,27 +564,64 @@ class JsonScadBuilder:
             scale_factor: A real number that will multiply the x and y 
                 coordinates of all points. 
         """
-        self.origin = origin
+        self.origin = np.asarray(origin, dtype=np.float64)
         self.scale_factor = scale_factor
 
         assert self.features, error_msg['emp_feat']
 
-        for feature in self.features:
-            # Handle polygons 
-            if(feature['geometry']['type'] == "Polygon"):
-                # index 0 contains exterior linear ring
-                coords = feature['geometry']['coordinates'][0] 
-                feature['geometry']['coordinates'][0] = list(
-                    map(self._transform_helper, coords))
-
-            # Handle multipolygons, which store coordinate data
-            # one layer deeper than polygons
-            elif(feature['geometry']['type'] == "MultiPolygon"):
-                for polygon in feature['geometry']['coordinates']:
-                    # index 0 contains exterior linear ring
-                    coords = polygon[0]
-                    polygon[0] = list(map(self._transform_helper, coords))
+        slots = [slot for feature in self.features 
+            for slot in self._exterior_rings(feature)]
+        if(slots):
+            # Translate and scale the points of all rings at once, then 
+            # split the result back into one array per ring
+            rings = [container[idx] for container, idx in slots]
+            offsets = np.cumsum([len(ring) for ring in rings])[:-1]
+            all_points = np.concatenate(rings)
+            all_points -= self.origin
+            all_points *= self.scale_factor
+            for (container, idx), ring in zip(slots, 
+                np.split(all_points, offsets)):
+                container[idx] = ring
+
+        print(status_msg['end_tsfm']) 
+
+    def process_geometry(self, origin, scale_factor, 
+        eps = DEFAULT_RDP_EPSILON, max_workers = None, threaded = True, 
+        processes = False):
+        """Simplifies and transforms the geometries in a single pass.
+
+        Equivalent to calling `simplify()` and then `transform()`, except 
+        that each linear ring is translated and scaled right after it is 
+        simplified, while it is still in cache, so that all points are 
+        visited only once. Only the points kept by the RDP algorithm are 
+        transformed.
 
+        Args:
+            origin: A list of two elements `[long,lat]` in decimal form.  
+            scale_factor: A real number that will multiply the x and y 
+                coordinates of all points. 
+            eps: The epsilon parameter of the RDP algorithm.
+            max_workers: The maximum number of workers. Defaults to the 
+                executor's default pool size.
+            threaded: Boolean that indicates whether to simplify features 
+                in parallel. If False, features are simplified one at a 
+                time in the calling thread.
+            processes: Boolean that indicates whether to use worker 
+                processes instead of threads if numba is not installed. 
+                On platforms that start worker processes by importing the 
+                calling script (such as Windows and macOS), the script 
+                must be guarded by `if __name__ == '__main__':`.
+        """
+        self.origin = np.asarray(origin, dtype=np.float64)
+        self.scale_factor = scale_factor
+
+        assert self.features, error_msg['emp_feat']
+        print(status_msg['start_smpl'])
+
+        num_points = self._simplify_features(eps, max_workers, threaded, 
+            processes, origin = self.origin, scale_factor = scale_factor)
+
+        print(status_msg['end_smpl'] + str(num_points))
         print(status_msg['end_tsfm']) 
 
     def offset(self, delta):
@@ -209,7 +657,7 @@ class JsonScadBuilder:
         assert self.features, error_msg['emp_feat']
         for feature, datum in zip(self.features, data):
             feature['properties'][data_key_name] = datum
-        print(status_msg['end_bind'] + str(min(self.num_features, len(data))))
+        print(status_msg['end_bind'] + str(min(len(self.features), len(data))))
 
     def bind_data_by_identifier(self, data_key_name, data, id_key):
         """Binds statistical data to GeoJSON features.
@@ -236,14 +684,20 @@ class JsonScadBuilder:
         # Counter for the number of datapoints with a match in the features list
         num_matches = 0 
 
-        # Search loop
+        # Index features by identifier value so that each data point
+        # is matched with a single lookup. If several features share an
+        # identifier value, the first one in the features list is used
+        index = {}
+        for feature in self.features:
+            if(id_key in feature['properties']):
+                index.setdefault(feature['properties'][id_key], feature)
+
+        # Lookup loop
         for datum in data:
-            for feature in self.features:
-                if(id_key in feature['properties'] and 
-                feature['properties'][id_key] == datum[0]):
-                    feature['properties'][data_key_name] = datum[1]
-                    num_matches += 1
-                    break
+            feature = index.get(datum[0])
+            if(feature is not None):
+                feature['properties'][data_key_name] = datum[1]
+                num_matches += 1
         
         # Only the data that matched with a feature were bound
         # num matches == num featueres with bound data  
@@ -267,24 +721,38 @@ class JsonScadBuilder:
 
         assert self.features, error_msg['emp_feat']
         assert self.bound_data_key_name, error_msg['bdata_nf']
+        assert domain_diff != 0, error_msg['emp_domn']
 
         # Keep track of min and max scaled height
         # Use range bounds as upper and lower bounds
         # for min and max heights respectively
         # Report to user once all heights have been scaled
         min_max_height = [range[1], range[0]]
-        
-        for feature in self.features: 
-            if(self.bound_data_key_name in feature['properties']):
-                scaling_ratio = (
-                    feature['properties'][self.bound_data_key_name] 
-                    - domain[0]) / domain_diff
-                scaled_height = range[0] + (scaling_ratio * range_diff)
-                feature['properties'][self.bound_data_key_name] = scaled_height
-                
-                # Checking for new min and max scaled heights
-                min_max_height[0] = min(scaled_height, min_max_height[0])
-                min_max_height[1] = max(scaled_height, min_max_height[1])
+
+        # Scan the features for the key at call time, so that values bound 
+        # by any call, or already present in the GeoJSON properties, are 
+        # all scaled
+        key = self.bound_data_key_name
+        bound_features = [feature for feature in self.features 
+            if key in feature['properties']]
+
+        # Scale all bound data values at once
+        values = np.fromiter((feature['properties'][key] 
+            for feature in bound_features), dtype=np.float64, 
+            count=len(bound_features))
+        scaling_ratios = (values - domain[0]) / domain_diff
+        scaled_heights = range[0] + (scaling_ratios * range_diff)
+
+        for feature, scaled_height in zip(bound_features, 
+            scaled_heights.tolist()):
+            feature['properties'][key] = scaled_height
+
+        # Checking for new min and max scaled heights
+        if(len(scaled_heights) > 0):
+            min_max_height[0] = min(scaled_heights.min().item(), 
+                min_max_height[0])
+            min_max_height[1] = max(scaled_heights.max().item(), 
+                min_max_height[1])
 
         print(status_msg['end_scle'] + str(min_max_height))
 
@@ -298,7 +766,7 @@ class JsonScadBuilder:
         """
         self.is_colored = True
 
-    def write_scad_file(self, filepath):
+    def write_scad_file(self, filepath, precision = None):
         """Generates OpenSCAD code and writes it to a file.
 
         Generates code that creates OpenSCAD polygons from each feature in 
@@ -307,79 +775,108 @@ class JsonScadBuilder:
         that feature is extruded to the default extrusion height, 2. This
         method then writes the OpenSCAD code to a file, which should have a 
         .scad file extension. If the file specified by `filepath` does not 
-        exist, this method creates the file.
+        exist, this method creates the file. Rounding coordinates to a 
+        `precision` reduces the size of the file, which OpenSCAD can then 
+        parse faster.
 
         Args:
             filepath: String containing the path to the .scad file.
+            precision: Integer number of decimal places to round point 
+                coordinates to. Defaults to no rounding.
         """
-        # Counter so that each list of points has a unique name
-        # points_0, points_1, ..., points_n where there are n-1 total polygons
-        count = 0
-        code = ''
-        debug_num_coords = 0
+        # Counter for the number of characters written to the file
+        char_out = 0
 
         assert self.features, error_msg['emp_feat']
 
-        for feature in self.features:
-            # Handle polygons 
-            if(feature['geometry']['type'] == "Polygon"):
-                code += 'points_' + str(count) + '= '
-                # index 0 contains exterior linear ring
-                code += str(feature['geometry']['coordinates'][0])
-                code += ';\n'
-
-                if(self.is_colored):
-                    code += 'color("' + str(
-                        choice(self.color_bank)) + '")\n'
-
-                if(self.bound_data_key_name != '' and 
-                self.bound_data_key_name in feature['properties']):
-                    code += 'linear_extrude(height=' + str(
-                        feature['properties'][self.bound_data_key_name]) + ')\n'
-                else:
-                    code += 'linear_extrude(height=' + str(
-                        self.DEFAULT_EXTRUDE_HEIGHT) + ')\n' 
-                
-                if(self.offset_delta != 0):
-                    code += 'offset(' + str(
-                        self.offset_delta) + ')\n'
-
-                code += 'polygon(points_' + str(count) + ');\n'
-                count += 1
-
-            # Handle multipolygons, which store coordinate data
-            # one layer deeper than polygons
-            elif(feature['geometry']['type'] == "MultiPolygon"):
-                for polygon in feature['geometry']['coordinates']:
-                    code += 'points_' + str(count) + '= '
-                    # index 0 contains exterior linear ring
-                    code += str(polygon[0])
-                    code += ';\n'
-
-                    if(self.is_colored):
-                        code += 'color("' + str(
-                            choice(self.color_bank)) + '")\n'
-                    
-                    if(self.bound_data_key_name != '' and 
-                    self.bound_data_key_name in feature['properties']):
-                        code += 'linear_extrude(height=' + str(
-                            feature['properties'][self.bound_data_key_name]) + ')\n'
-                    else:
-                        code += 'linear_extrude(height=' + str(
-                            self.DEFAULT_EXTRUDE_HEIGHT) + ')\n' 
-
-                    if(self.offset_delta != 0):
-                        code += 'offset(' + str(
-                            self.offset_delta) + ')\n'
-
-                    code += 'polygon(points_' + str(count) + ');\n'
-                    count += 1
-
-        with open(filepath,'w') as f:
-            char_out = f.write(code)
+        # Draw the colors for all polygons at once
+        if(self.is_colored):
+            num_polygons = sum(1 for feature in self.features 
+                for _ in self._exterior_rings(feature))
+            color_lines = iter([f'color("{color}")\n' 
+                for color in choices(self.COLOR_BANK, k = num_polygons)])
+        else:
+            color_lines = repeat('')
+
+        # Write the code for each polygon directly to the file as it is 
+        # generated instead of building the whole file in memory first
+        with open(filepath, 'wb', buffering = 1 << 20) as f:
+            for code in self._scad_code(self.features, color_lines, 
+                precision):
+                char_out += f.write(code)
             
         print(status_msg['end_wrte'] + filepath + 
         ", characters written: " + str(char_out))
+
+    def stream_build(self, json_filepath, scad_filepath, origin, 
+        scale_factor, eps = DEFAULT_RDP_EPSILON, precision = None):
+        """Builds an OpenSCAD file from a GeoJSON file one feature at a time.
+
+        Alternative to calling `stream_features()`, `process_geometry()` and 
+        `write_scad_file()` for GeoJSON files too large to hold in memory. 
+        Parses each feature from the file at `json_filepath`, simplifies and 
+        transforms its geometries, and appends its OpenSCAD code to the file 
+        at `scad_filepath` before parsing the next feature, so that peak 
+        memory depends on the largest feature instead of the whole file. 
+        Features are not stored in `features`, so data cannot be bound to 
+        them; each feature is extruded to the value of its 
+        `bound_data_key_name` property if it has one, and to the default 
+        extrusion height otherwise. The offset distance and color preview 
+        mode apply as in `write_scad_file()`. Requires the `ijson` module.
+
+        Args:
+            json_filepath: String containing the path to the GeoJSON file.
+            scad_filepath: String containing the path to the .scad file.
+            origin: A list of two elements `[long,lat]` in decimal form.  
+            scale_factor: A real number that will multiply the x and y 
+                coordinates of all points. 
+            eps: The epsilon parameter of the RDP algorithm.
+            precision: Integer number of decimal places to round point 
+                coordinates to. Defaults to no rounding.
+        """
+        assert ijson is not None, error_msg['ijson_nf']
+        self.origin = np.asarray(origin, dtype=np.float64)
+        self.scale_factor = scale_factor
+
+        # Counters for the number of features, points and characters
+        # Report to user once the whole file has been built
+        num_features = 0
+        num_points = 0
+        char_out = 0
+
+        # The number of polygons is not known in advance, so draw colors 
+        # one polygon at a time
+        if(self.is_colored):
+            colors = self.COLOR_BANK
+            color_lines = (f'color("{choice(colors)}")\n' 
+                for _ in repeat(None))
+        else:
+            color_lines = repeat('')
+
+        def processed_features(f):
+            # Simplify and transform each feature as it is parsed
+            nonlocal num_features, num_points
+            for feature in ijson.items(f, 'features.item', use_float=True):
+                self._materialize_arrays(feature)
+                for container, idx in self._exterior_rings(feature):
+                    sampled_coords = _rdp_transform(container[idx], eps, 
+                        self.origin, scale_factor)
+                    container[idx] = sampled_coords
+                    num_points += len(sampled_coords)
+                num_features += 1
+                yield feature
+
+        with open(json_filepath, 'rb') as f_in, open(
+            scad_filepath, 'wb', buffering = 1 << 20) as f_out:
+            for code in self._scad_code(processed_features(f_in), 
+                color_lines, precision):
+                char_out += f_out.write(code)
+
+        print(status_msg['end_extc'] + str(num_features))
+        print(status_msg['end_smpl'] + str(num_points))
+        print(status_msg['end_tsfm'])
+        print(status_msg['end_wrte'] + scad_filepath + 
+        ", characters written: " + str(char_out))
         
 # ERROR AND STATUS MESSAGES
 error_msg = {
@@ -388,7 +885,11 @@ error_msg = {
     'emp_feat' : ("features list cannot be empty. "
     "Perhaps you forgot to call extract_features()?"),
     'bdata_nf' : ("bound_data_key_name cannot be empty. "
-    "Perhaps you forgot to bind data to the model?") 
+    "Perhaps you forgot to bind data to the model?"),
+    'emp_domn' : ("domain cannot have zero width. "
+    "The min and max values of the domain must differ."),
+    'ijson_nf' : ("ijson module not found. "
+    "Install ijson to stream GeoJSON features.")
 }
 
 status_msg = {